@@ -1,6 +1,7 @@
 import argparse
 import os
-from server import fileReceiver
+import socket
+from server import fileReceiver, receiverPool
 from client import fileSender
 
 # Define the minimum and maximum port numbers
@@ -67,6 +68,7 @@ if __name__ == "__main__":
     parser.add_argument('-f', '--file', type=str, help="Path to the JPG file to send (required in client mode).")
     parser.add_argument('-w', '--window', type=int, default=3, help="Size of the sliding window for packet transmission (default: 3).")
     parser.add_argument('-d', '--discard', type=int, default=None, help="Packet sequence number to discard for testing purposes.")
+    parser.add_argument('-n', '--workers', type=int, default=1, help="Number of server worker processes sharing the port with SO_REUSEPORT (default: 1).")
 
     args = parser.parse_args()
     
@@ -80,7 +82,15 @@ if __name__ == "__main__":
     
     # Running the server mode
     if args.server:
-        server = fileReceiver(args.ip, args.port, args.discard)
+        if args.workers < 1:
+            parser.error("Number of workers must be at least 1.")
+        # Running several workers on the same port, needs SO_REUSEPORT support from the operating system
+        if args.workers > 1:
+            if not hasattr(socket, 'SO_REUSEPORT'):
+                parser.error("Multiple workers require SO_REUSEPORT, which is not supported on this system.")
+            server = receiverPool(args.ip, args.port, args.workers, args.discard)
+        else:
+            server = fileReceiver(args.ip, args.port, args.discard)
         server.start()
     
     # Running the client mode
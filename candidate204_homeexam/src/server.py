@@ -1,37 +1,59 @@
+import os
 import socket
 import struct
+import multiprocessing
+import queue
+import signal
+import sys
 from datetime import datetime
 
 class fileReceiver:
     '''
     Description:
     This class implements a "file receiver" using UDP/DRTP protocol.
+    Every client address has its own transfer state, so packets from several clients can arrive on the same socket.
 
     Attributes:
     serverIP (str): The IP address of the server.
     serverPort (int): The port number of the server.
     outputFile (str): The name of the file to save the received data (receive_photo.jpg).
+    discard (int): The sequence number of the packet to discard in every transfer for testing purposes.
+    flows (dict): The transfer state of every client, with the client address as key.
+    socket (socket.socket): The socket object for communication.
+    reusePort (bool): Whether the socket is bound with SO_REUSEPORT so several workers can share the same ip and port.
+    workerId (int): The number of the worker process running this receiver (None when running alone).
+    statsQueue (multiprocessing.Queue): Queue used to report throughput stats to the receiverPool supervisor.
+    flowTimeout (float): Seconds without packets after which a flow is closed.
+    verbose (bool): Whether every data packet and ack is printed, only without workers since the output of many clients would be mixed.
+    lastEviction (datetime): The last time idle flows were looked for.
+
+    Every flow in flows holds:
+    connected (bool): Whether the three-way handshake is finished.
+    outputFile (str): The name of the file the data of this client is saved to.
+    file (file object): The output file, kept open for the whole transfer.
     expectedSeq (int): The sequence number expected to be received next.
     receivedData (dict): Dictionary to store received data packets.
-    socket (socket.socket): The socket object for communication.
+    discard (int): The sequence number still to be discarded in this transfer.
     startTime (datetime): The start time of the data reception.
-    endTime (datetime): The end time of the data reception.
     totalDataReceived (int): The total size of data received in bytes.
+    lastPacket (datetime): The time the last packet of this client was received.
 
     Methods:
     __init__: Initializes the fileReceiver object.
-    threeWayHandshake: Performs the three-way handshake protocol similar to tcp.
     start: Starts the file receiving process.
+    handlePacket: Passes a packet on to the right handler based on its flags and client.
     handleSyn: Handles the SYN packet during the handshake.
+    handleAck: Handles the ACK packet that finishes the handshake.
     timestamp: Returns the current timestamp in a specific format.
     handleData: Handles incoming data packets.
     ack: Sends acknowledgment for received packets.
     save_data: Saves received data to the output file.
     handleFin: Handles the FIN packet to terminate the connection between server and client.
     throughput: Calculates and prints the throughput of data reception.
+    evictFlows: Closes the flows of clients that have stopped sending.
     '''
 
-    def __init__(server, ip, port, discard=None):
+    def __init__(server, ip, port, discard=None, reusePort=False, workerId=None, statsQueue=None):
         '''
         Description:
         Initializes the fileReceiver object with specified parameters.
@@ -39,10 +61,13 @@ class fileReceiver:
         Arguments:
         ip (str): The IP address of the server.
         port (int): The port number of the server.
-        discard (int): The sequence number of the packet to discard for testing purposes.
+        discard (int): The sequence number of the packet to discard in every transfer for testing purposes.
+        reusePort (bool): Sets SO_REUSEPORT on the socket before binding, used by receiverPool workers.
+        workerId (int): The number of the worker process running this receiver.
+        statsQueue (multiprocessing.Queue): Queue to report throughput stats of every transfer to.
 
         Use of other input and output parameters in the function:
-        Initializes the socket and binds it to the given IP and port. 
+        Initializes the socket and binds it to the given IP and port.
 
         Returns None but as mentioned Initializes the server
         '''
@@ -50,86 +75,107 @@ class fileReceiver:
         server.serverIP = ip
         server.serverPort = port
         server.outputFile = "received_photo.jpg"
-        server.expectedSeq = 1
-        server.receivedData = {}
+        server.flows = {}
+        server.reusePort = reusePort
+        server.workerId = workerId
+        server.statsQueue = statsQueue
+        server.flowTimeout = 5
+        server.verbose = workerId is None
+        server.lastEviction = datetime.now()
         server.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        #Lets every worker bind the same ip and port, the kernel then hashes each client flow to one worker
+        if server.reusePort:
+            server.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         server.socket.bind((server.serverIP, server.serverPort))
-        server.startTime = None
-        server.endTime = None
-        server.totalDataReceived = 0
-
-        print(f"Server started at {server.serverIP} on port {server.serverPort}")
-
-    def threeWayHandshake(server):
-        '''
-        Description:
-        Performs the three-way handshake protocol for connection establishment between server and client
-
-        Use of other input and output parameters in the function:
-        Receives a SYN packet from the client, responds with a SYN-ACK, and waits for an ACK from the client
-
-        Returns None, but as mention establishes a connection between server and client
-
-        Raises:
-        ConnectionError: If the expected SYN or ACK packets are not received.
-        '''
-        packet, clientAddress = server.socket.recvfrom(1000)
-        _, _, flags = struct.unpack('!HHH', packet)
-        if flags & 8:
-            print("SYN packet is received")
-            server.handleSyn(clientAddress)
-        else:
-            raise ConnectionError("First SYN was not accepted")
 
-        packet, clientAddress = server.socket.recvfrom(1000)
-        _, _, flags = struct.unpack('!HHH', packet)
-        if flags & 4:
-            print("ACK packet is recieved")
-            return
+        if server.workerId is None:
+            print(f"Server started at {server.serverIP} on port {server.serverPort}")
         else:
-            raise ConnectionError("First ACK was not accepted")
+            print(f"Worker {server.workerId} started at {server.serverIP} on port {server.serverPort}")
 
     def start(server) -> None:
         '''
         Description:
         Starts the file receiving process.
 
-        Tries the three way handshake with client
-        Creates the received_photo.jpg file if not already exists
-        Unpacks all data from client
-        Closes the connection upon receiving fin flag
-        Calculates throughput 
+        Receives packets from all clients and passes them on to handlePacket
+        Every client does the three way handshake, sends its data and closes the connection with the fin flag
+        Once a second, flows of clients that have stopped sending are closed
 
         Returns None
 
         Raises:
-        KeyboardInterrupt: If the server is manually interrupted with ctrl + c. 
+        KeyboardInterrupt: If the server is manually interrupted with ctrl + c.
         '''
+        #Wakes the loop up now and then so idle flows are closed even when no packets arrive
+        server.socket.settimeout(1)
         try:
-            server.threeWayHandshake()
-
-            with open(server.outputFile, "wb") as f:
-                pass
-            
-            if server.startTime is None:
-                server.startTime = datetime.now()
-
             while True:
-                packet, clientAddress = server.socket.recvfrom(1000)
-                _, _, flags = struct.unpack('!HHH', packet[:6])
+                try:
+                    packet, clientAddress = server.socket.recvfrom(1000)
+                    server.handlePacket(packet, clientAddress)
+                except socket.timeout:
+                    pass
 
-                if flags & 2:  # FIN flag
-                    print("FIN packet is received")
-                    server.handleFin(clientAddress)
-                    server.throughput()
-                else:
-                    server.handleData(packet, clientAddress)
+                if (datetime.now() - server.lastEviction).total_seconds() >= 1:
+                    server.evictFlows()
 
         #Server socket closing upon termination (If server is stuck in a loop, pressing ctrl + c terminates it)
         except KeyboardInterrupt:
             server.socket.close()
             raise KeyboardInterrupt("Connection Closes")
 
+    def handlePacket(server, packet, clientAddress):
+        '''
+        Description:
+        Passes a packet on to the right handler based on its flags and client.
+
+        Arguments:
+        packet (bytes): The received packet from client.
+        clientAddress (tuple): The address of the client.
+
+        Use of other input and output parameters in the function:
+        SYN starts a new flow, ACK finishes its handshake, FIN closes it and packets without flags are data.
+        Packets that are too short, or do not belong to a connected flow, are ignored so one bad packet can not stop the server.
+        Without workers, a SYN from a new client is ignored while another client is being served.
+
+        Returns None
+        '''
+        if len(packet) < 6:
+            print(f"{server.timestamp()} -- ignoring too short packet from {clientAddress}")
+            return
+
+        _, _, flags = struct.unpack('!HHH', packet[:6])
+        flow = server.flows.get(clientAddress)
+        if flow is not None:
+            flow['lastPacket'] = datetime.now()
+
+        if flags & 8:  # SYN flag
+            #Without workers every client writes to received_photo.jpg, so only one client is served at a time
+            if server.workerId is None and any(address != clientAddress for address in server.flows):
+                print(f"{server.timestamp()} -- ignoring SYN from {clientAddress}, busy with another client")
+                return
+            print("SYN packet is received")
+            server.handleSyn(clientAddress)
+        elif flow is None:
+            print(f"{server.timestamp()} -- ignoring packet from unknown client {clientAddress}")
+        elif flags & 4:  # ACK flag
+            if not flow['connected']:
+                print("ACK packet is recieved")
+                server.handleAck(clientAddress)
+        elif not flow['connected']:
+            print(f"{server.timestamp()} -- ignoring packet from {clientAddress} before the handshake is done")
+        elif flags & 2:  # FIN flag
+            print("FIN packet is received")
+            server.handleFin(clientAddress)
+            server.throughput(clientAddress)
+            flow['file'].close()
+            del server.flows[clientAddress]
+        elif len(packet) == 1000:
+            server.handleData(packet, clientAddress)
+        else:
+            print(f"{server.timestamp()} -- ignoring data packet of {len(packet)} bytes from {clientAddress}")
+
     def handleSyn(server, clientAddress):
         '''
         Description:
@@ -137,16 +183,60 @@ class fileReceiver:
 
         Arguments:
         clientAddress (tuple): The address of the client.
-        
+
         Use of other input and output parameters in the function:
+        Creates a new flow for the client, replacing any old flow from the same address.
         Prepares and sends a SYN-ACK packet to the client to acknowledge the SYN request.
 
         Returns syn ack to client
         '''
+        #Workers share the same folder, so every client gets its own file
+        if server.workerId is None:
+            outputFile = server.outputFile
+        else:
+            outputFile = f"received_photo_{clientAddress[0]}_{clientAddress[1]}.jpg"
+
+        #A new SYN from the same address starts over, so the file of the old flow is closed
+        oldFlow = server.flows.get(clientAddress)
+        if oldFlow is not None and oldFlow['file'] is not None:
+            oldFlow['file'].close()
+
+        server.flows[clientAddress] = {
+            'connected': False,
+            'outputFile': outputFile,
+            'file': None,
+            'expectedSeq': 1,
+            'receivedData': {},
+            'discard': server.discard,
+            'startTime': None,
+            'totalDataReceived': 0,
+            'lastPacket': datetime.now(),
+        }
+
         synAck = struct.pack('!HHH', 0, 0, 12)
         server.socket.sendto(synAck, clientAddress)
         print("SYN-ACK packet is sent")
 
+    def handleAck(server, clientAddress):
+        '''
+        Description:
+        Handles the ACK packet that finishes the handshake.
+
+        Arguments:
+        clientAddress (tuple): The address of the client.
+
+        Use of other input and output parameters in the function:
+        Marks the flow as connected, opens its output file for the whole transfer and starts the time of the data reception.
+
+        Returns None
+        '''
+        flow = server.flows[clientAddress]
+        flow['connected'] = True
+
+        flow['file'] = open(flow['outputFile'], "wb")
+
+        flow['startTime'] = datetime.now()
+
     def timestamp(server):
         '''
         Description:
@@ -171,36 +261,38 @@ class fileReceiver:
 
         Use of other input and output parameters in the function:
         Unpacks the packet to retrieve the sequence number, flags, and data.
-        Discards the packet if its sequence number matches the discard number.
+        Discards the packet if its sequence number matches the discard number of the flow.
         Stores the data in receivedData if the sequence number matches the expected sequence number.
         Sends an acknowledgment for received packets.
 
         Returns None
         '''
+        flow = server.flows[clientAddress]
         seqNum, ackNum, flags, data = struct.unpack('!HHH994s', packet)
 
-        #if the sequence number matches the discarding number, discard this packet. 
-        if seqNum == server.discard:
-            server.discard = None
+        #if the sequence number matches the discarding number, discard this packet.
+        if seqNum == flow['discard']:
+            flow['discard'] = None
             print(f"Discarding {seqNum}")
             return
 
         #confirms the expected received packets
-        if seqNum == server.expectedSeq:
-            print(f"{server.timestamp()} -- packet {seqNum} is received")
-            server.receivedData[seqNum] = data  # Remove padding bytes
-            server.expectedSeq += 1
+        if seqNum == flow['expectedSeq']:
+            if server.verbose:
+                print(f"{server.timestamp()} -- packet {seqNum} is received")
+            flow['receivedData'][seqNum] = data  # Remove padding bytes
+            flow['expectedSeq'] += 1
 
             # Save sequential data
-            server.save_data()
+            server.save_data(flow)
 
             # Send ACK for received packet only if it's not already acknowledged
-            if seqNum not in server.receivedData:
+            if seqNum not in flow['receivedData']:
                 server.ack(clientAddress, seqNum)
 
-        elif seqNum < server.expectedSeq:
+        elif seqNum < flow['expectedSeq']:
             # Send ACK for received packet only if it's not already acknowledged
-            if seqNum not in server.receivedData:
+            if seqNum not in flow['receivedData']:
                 server.ack(clientAddress, seqNum)
 
 
@@ -221,24 +313,27 @@ class fileReceiver:
         '''
         ackPacket = struct.pack('!HHH', 0, seqNum, 4)
         server.socket.sendto(ackPacket, clientAddress)
-        print(f"{server.timestamp()} -- sending ack for the received {seqNum}")
+        if server.verbose:
+            print(f"{server.timestamp()} -- sending ack for the received {seqNum}")
 
-    def save_data(server):
+    def save_data(server, flow):
         '''
         Description:
         Saves received data to the output file.
 
+        Arguments:
+        flow (dict): The transfer state of the client.
+
         Use of other input and output parameters in the function:
-        Writes data to the output file in the correct order based on the sequence numbers.
+        Writes data to the open output file of the flow in the correct order based on the sequence numbers.
         Updates the total size of data received.
 
-        Returns the saved data in received_photo.jpg
+        Returns the saved data in the output file of the flow
         '''
-        with open(server.outputFile, "ab") as f:
-            while server.expectedSeq - 1 in server.receivedData:
-                data = server.receivedData.pop(server.expectedSeq - 1)
-                f.write(data)
-                server.totalDataReceived += len(data)
+        while flow['expectedSeq'] - 1 in flow['receivedData']:
+            data = flow['receivedData'].pop(flow['expectedSeq'] - 1)
+            flow['file'].write(data)
+            flow['totalDataReceived'] += len(data)
 
     def handleFin(server, clientAddress):
         '''
@@ -257,19 +352,340 @@ class fileReceiver:
         server.socket.sendto(finAck, clientAddress)
         print("FIN-ACK packet is sent")
 
-    def throughput(server):
+    def throughput(server, clientAddress):
         '''
         Description:
         Calculates and prints the throughput of data reception.
 
+        Arguments:
+        clientAddress (tuple): The address of the client.
+
         Use of other input and output parameters in the function:
-        Calculates the elapsed time between the start and end of data reception.
+        Calculates the elapsed time between the start and end of data reception of the flow.
         Computes the throughput in Mbps.
+        Sends the stats to the supervisor if the receiver runs as a worker.
+
+        Returns:
+        float: The throughput in Mbps, or None if no data reception was started.
+        '''
+        flow = server.flows[clientAddress]
+        if flow['startTime']:
+            endTime = datetime.now()
+            elapsedTime = (endTime - flow['startTime']).total_seconds()
+            throughput = (flow['totalDataReceived'] * 8) / (elapsedTime * 1_000_000)  # Convert to Mbps
+            print(f"\nThe throughput is {throughput:.2f} Mbps")
+
+            if server.statsQueue is not None:
+                server.statsQueue.put({
+                    'event': 'transfer',
+                    'worker': server.workerId,
+                    'bytes': flow['totalDataReceived'],
+                    'start': flow['startTime'].timestamp(),
+                    'end': endTime.timestamp(),
+                })
+            return throughput
+
+    def evictFlows(server):
+        '''
+        Description:
+        Closes the flows of clients that have stopped sending.
+
+        Use of other input and output parameters in the function:
+        Removes every flow that has not received a packet for flowTimeout seconds, for example a client that crashed
+        or a stray SYN. The output file of an evicted flow is unfinished, so it is removed as well.
+
+        Returns None
+        '''
+        server.lastEviction = datetime.now()
+        for clientAddress, flow in list(server.flows.items()):
+            if (server.lastEviction - flow['lastPacket']).total_seconds() < server.flowTimeout:
+                continue
+
+            print(f"{server.timestamp()} -- closing idle flow from {clientAddress}")
+            del server.flows[clientAddress]
+            #The file is only created once the handshake is done
+            if flow['file'] is not None:
+                flow['file'].close()
+                os.remove(flow['outputFile'])
+
+
+def runWorker(ip, port, discard, workerId, statsQueue):
+    '''
+    Description:
+    Runs one fileReceiver inside a worker process of the receiverPool.
+
+    Arguments:
+    ip (str): The IP address of the server.
+    port (int): The port number of the server.
+    discard (int): The sequence number of the packet to discard for testing purposes.
+    workerId (int): The number of the worker process.
+    statsQueue (multiprocessing.Queue): Queue to report readiness, errors and throughput stats to the supervisor.
+
+    Use of other input and output parameters in the function:
+    Tells the supervisor that the worker is ready once its socket is bound, or sends the error if binding fails.
+
+    Returns None
+    '''
+    try:
+        server = fileReceiver(ip, port, discard, reusePort=True, workerId=workerId, statsQueue=statsQueue)
+    except OSError as e:
+        statsQueue.put({'event': 'error', 'worker': workerId, 'error': str(e)})
+        return
+    statsQueue.put({'event': 'ready', 'worker': workerId})
+
+    try:
+        server.start()
+    #The supervisor prints the summary, so the worker just exits on ctrl + c
+    except KeyboardInterrupt:
+        pass
+
+
+class receiverPool:
+    '''
+    Description:
+    This class implements a supervisor that runs several fileReceiver workers on the same ip and port.
+    Every worker binds its own socket with SO_REUSEPORT, so the kernel spreads the clients over the workers
+    and the file transfers are handled on several cores at the same time.
+
+    Attributes:
+    serverIP (str): The IP address of the server.
+    serverPort (int): The port number of the server.
+    discard (int): The sequence number of the packet to discard for testing purposes.
+    workers (int): The number of worker processes to start.
+    processes (dict): The worker processes, with the worker number as key.
+    ready (set): The worker numbers whose socket is bound.
+    statsQueue (multiprocessing.Queue): Queue the workers report readiness, errors and the stats of every transfer to.
+    workerData (dict): Total bytes received by every worker.
+    transfers (int): The number of finished transfers.
+    windows (list): Windows of overlapping transfers, each with the start, end, bytes and number of its transfers.
+    currentWindow (dict): The window the latest finished transfer belongs to.
+    windowHistory (float): Seconds a window is kept after the latest finished transfer, so late reports can still join it.
 
-        Returns Throughput
+    Methods:
+    __init__: Initializes the receiverPool object.
+    start: Starts the workers and collects their stats.
+    startWorker: Starts one worker process.
+    receive: Waits for one message from the workers and handles it.
+    checkWorkers: Restarts workers that have stopped.
+    stop: Terminates all worker processes.
+    collect: Adds the stats of one finished transfer to the totals.
+    throughput: Calculates and prints the aggregate throughput of the overlapping transfers.
+    '''
+
+    def __init__(pool, ip, port, workers, discard=None):
+        '''
+        Description:
+        Initializes the receiverPool object with specified parameters.
+
+        Arguments:
+        ip (str): The IP address of the server.
+        port (int): The port number of the server.
+        workers (int): The number of worker processes to start.
+        discard (int): The sequence number of the packet to discard for testing purposes.
+
+        Returns None
+        '''
+        pool.serverIP = ip
+        pool.serverPort = port
+        pool.discard = discard
+        pool.workers = workers
+        pool.processes = {}
+        pool.ready = set()
+        pool.statsQueue = multiprocessing.Queue()
+        pool.workerData = {workerId: 0 for workerId in range(workers)}
+        pool.transfers = 0
+        pool.windows = []
+        pool.currentWindow = None
+        pool.windowHistory = 3600
+
+    def start(pool):
+        '''
+        Description:
+        Starts the workers and collects their stats.
+
+        Use of other input and output parameters in the function:
+        Starts one process per worker, each running its own fileReceiver on the same ip and port.
+        Waits until every worker has bound its socket before the pool counts as started.
+        Prints the aggregate throughput after every finished transfer and restarts workers that stop.
+        The workers are always terminated when the supervisor stops, also on SIGTERM.
+
+        Returns None
+
+        Raises:
+        OSError: If a worker can not bind its socket.
+        KeyboardInterrupt: If the server is manually interrupted with ctrl + c.
+        '''
+        #Turning SIGTERM into SystemExit so the finally below stops the workers
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+        try:
+            for workerId in range(pool.workers):
+                pool.startWorker(workerId)
+
+            while len(pool.ready) < pool.workers:
+                pool.receive()
+                pool.checkWorkers()
+
+            print(f"Started {pool.workers} workers at {pool.serverIP} on port {pool.serverPort}")
+
+            while True:
+                pool.receive()
+                pool.checkWorkers()
+
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt("Connection Closes")
+
+        finally:
+            pool.stop()
+
+    def startWorker(pool, workerId):
+        '''
+        Description:
+        Starts one worker process.
+
+        Arguments:
+        workerId (int): The number of the worker.
+
+        Returns None
+        '''
+        process = multiprocessing.Process(target=runWorker, args=(pool.serverIP, pool.serverPort, pool.discard, workerId, pool.statsQueue), daemon=True)
+        process.start()
+        pool.processes[workerId] = process
+
+    def receive(pool, timeout=1):
+        '''
+        Description:
+        Waits for one message from the workers and handles it.
+
+        Arguments:
+        timeout (float): Seconds to wait for a message.
+
+        Use of other input and output parameters in the function:
+        Marks workers as ready, collects the stats of finished transfers and prints the aggregate throughput.
+
+        Returns:
+        bool: True if a message was handled, False if the timeout passed.
+
+        Raises:
+        OSError: If a worker reports that it could not bind its socket.
+        '''
+        try:
+            message = pool.statsQueue.get(timeout=timeout)
+        except queue.Empty:
+            return False
+
+        if message['event'] == 'ready':
+            pool.ready.add(message['worker'])
+        elif message['event'] == 'error':
+            raise OSError(f"Worker {message['worker']} could not bind to {pool.serverIP} on port {pool.serverPort}: {message['error']}")
+        else:
+            pool.collect(message)
+            pool.throughput()
+        return True
+
+    def checkWorkers(pool):
+        '''
+        Description:
+        Restarts workers that have stopped.
+
+        Use of other input and output parameters in the function:
+        A worker that stops after binding is started again.
+        A worker that stops before binding stops the pool, since starting it again would fail the same way.
+
+        Returns None
+
+        Raises:
+        OSError: If a worker stopped before its socket was bound.
+        '''
+        for workerId, process in list(pool.processes.items()):
+            if process.is_alive():
+                continue
+
+            if workerId not in pool.ready:
+                #Handling messages the worker sent before it stopped, so its own error is raised if there is one
+                while pool.receive(timeout=0.1):
+                    pass
+            #The worker may have bound and sent ready just before it stopped
+            if workerId not in pool.ready:
+                raise OSError(f"Worker {workerId} exited with code {process.exitcode} before binding to {pool.serverIP} on port {pool.serverPort}")
+
+            print(f"Worker {workerId} exited with code {process.exitcode}, restarting it")
+            pool.ready.discard(workerId)
+            pool.startWorker(workerId)
+
+    def stop(pool):
+        '''
+        Description:
+        Terminates all worker processes.
+
+        Returns None
+        '''
+        for process in pool.processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in pool.processes.values():
+            process.join()
+
+    def collect(pool, stats):
+        '''
+        Description:
+        Adds the stats of one finished transfer to the totals.
+
+        Arguments:
+        stats (dict): The worker number, bytes received, start and end time of the transfer.
+
+        Use of other input and output parameters in the function:
+        The transfer is merged with every window it overlaps, also older ones, since transfers are reported in the order
+        they end and not the order they start. A transfer that overlaps no window starts a new one.
+        Windows that ended more than windowHistory seconds before the latest transfer are forgotten, so a transfer
+        that started earlier than that is only counted together with the transfers it still overlaps.
+
+        Returns None
+        '''
+        pool.workerData[stats['worker']] += stats['bytes']
+        pool.transfers += 1
+
+        window = {'start': stats['start'], 'end': stats['end'], 'bytes': stats['bytes'], 'transfers': 1}
+        merged = True
+        while merged:
+            merged = False
+            for other in pool.windows:
+                if other['start'] <= window['end'] and window['start'] <= other['end']:
+                    window['start'] = min(window['start'], other['start'])
+                    window['end'] = max(window['end'], other['end'])
+                    window['bytes'] += other['bytes']
+                    window['transfers'] += other['transfers']
+                    pool.windows.remove(other)
+                    merged = True
+                    break
+
+        pool.windows.append(window)
+        pool.currentWindow = window
+        latestEnd = max(other['end'] for other in pool.windows)
+        pool.windows = [other for other in pool.windows if other['end'] >= latestEnd - pool.windowHistory]
+
+    def throughput(pool):
+        '''
+        Description:
+        Calculates and prints the aggregate throughput of the overlapping transfers.
+
+        Use of other input and output parameters in the function:
+        Divides the data received in the window of the latest transfer by the time from its first transfer started
+        to its last one ended, so idle time between transfers does not lower the number.
+        Prints the data received by every worker since the pool started.
+
+        Returns:
+        float: The aggregate throughput in Mbps, or None if no transfer is finished.
         '''
-        if server.startTime:
-            server.endTime = datetime.now()
-            elapsedTime = (server.endTime - server.startTime).total_seconds()
-            throughput = (server.totalDataReceived * 8) / (elapsedTime * 1_000_000)  # Convert to Mbps
-            print(f"\nThe throughput is {throughput:.2f} Mbps")
\ No newline at end of file
+        if pool.currentWindow is None:
+            return None
+
+        window = pool.currentWindow
+        elapsedTime = window['end'] - window['start']
+        throughput = (window['bytes'] * 8) / (elapsedTime * 1_000_000)  # Convert to Mbps
+
+        for workerId, data in pool.workerData.items():
+            print(f"Worker {workerId} has received {data} bytes")
+        print(f"{pool.transfers} transfers are finished with {sum(pool.workerData.values())} bytes in total")
+        print(f"The aggregate throughput of the {window['transfers']} overlapping transfers is {throughput:.2f} Mbps\n")
+        return throughput
\ No newline at end of file
@@ -0,0 +1,251 @@
+import os
+import re
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import time
+
+import pytest
+
+from server import fileReceiver, receiverPool
+
+srcDir = os.path.dirname(os.path.abspath(__file__))
+application = os.path.join(srcDir, "application.py")
+photo = os.path.join(srcDir, "iceland_safiqul.jpg")
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'SO_REUSEPORT'), reason="SO_REUSEPORT is not supported")
+
+
+def freePort():
+    '''
+    Returns a UDP port on 127.0.0.1 that is free right now.
+    '''
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def waitFor(logPath, text, count=1, timeout=20):
+    '''
+    Waits until text shows up count times in the log file of the server, and returns the log.
+    '''
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with open(logPath) as f:
+            log = f.read()
+        if log.count(text) >= count:
+            return log
+        time.sleep(0.1)
+    raise AssertionError(f"{text!r} not found in server log:\n{log[-2000:]}")
+
+
+def startServer(tmpPath, port, *args):
+    '''
+    Starts application.py in server mode with its output in server.log, and returns the process and log path.
+    '''
+    logPath = tmpPath / "server.log"
+    log = open(logPath, "w")
+    process = subprocess.Popen([sys.executable, "-u", application, "-s", "-p", str(port), *args], cwd=tmpPath, stdout=log, stderr=subprocess.STDOUT)
+    log.close()
+    return process, logPath
+
+
+def stopServer(process):
+    '''
+    Stops the server with SIGTERM and waits for it.
+    '''
+    process.send_signal(signal.SIGTERM)
+    process.wait(timeout=10)
+
+
+def startClient(tmpPath, port):
+    '''
+    Starts application.py in client mode sending the photo.
+    '''
+    return subprocess.Popen([sys.executable, application, "-c", "-p", str(port), "-f", photo, "-w", "5"], cwd=tmpPath, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def finishClient(client):
+    '''
+    Waits for a client and checks that it finished without errors.
+    '''
+    _, err = client.communicate(timeout=60)
+    assert client.returncode == 0, err.decode()
+
+
+def receivedSize():
+    '''
+    Returns the size the server writes for the photo, since the last packet is padded to 994 bytes.
+    '''
+    return -(-os.path.getsize(photo) // 994) * 994
+
+
+def checkReceived(path):
+    '''
+    Checks that a received file holds the photo followed by the padding of the last packet.
+    '''
+    with open(photo, "rb") as f:
+        original = f.read()
+    with open(path, "rb") as f:
+        received = f.read()
+    assert len(received) == receivedSize()
+    assert received[:len(original)] == original
+
+
+class deadProcess:
+    '''
+    Stands in for a worker process that has already stopped.
+    '''
+    exitcode = -9
+
+    def is_alive(self):
+        return False
+
+
+def test_pool_restarts_worker_that_stopped_before_ready_was_read(monkeypatch):
+    pool = receiverPool("127.0.0.1", freePort(), 1)
+    pool.processes[0] = deadProcess()
+    pool.statsQueue.put({'event': 'ready', 'worker': 0})
+    restarted = []
+    monkeypatch.setattr(pool, "startWorker", restarted.append)
+
+    pool.checkWorkers()
+
+    assert restarted == [0]
+
+
+def test_pool_throughput_joins_every_overlapping_transfer():
+    pool = receiverPool("127.0.0.1", freePort(), 1)
+    for start, end in [(0, 10), (11, 12), (5, 13), (20, 21)]:
+        pool.collect({'event': 'transfer', 'worker': 0, 'bytes': 1_000_000, 'start': start, 'end': end})
+        if end == 13:
+            #The last transfer overlaps both earlier ones, so all three count over 0 to 13 seconds
+            assert pool.currentWindow == {'start': 0, 'end': 13, 'bytes': 3_000_000, 'transfers': 3}
+            assert pool.throughput() == pytest.approx(3_000_000 * 8 / (13 * 1_000_000))
+
+    #After an idle gap a new window starts
+    assert pool.currentWindow == {'start': 20, 'end': 21, 'bytes': 1_000_000, 'transfers': 1}
+    assert len(pool.windows) == 2
+    assert pool.transfers == 4
+
+
+def test_worker_evicts_idle_flows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = fileReceiver("127.0.0.1", freePort(), reusePort=True, workerId=0)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as client:
+        client.bind(("127.0.0.1", 0))
+        clientAddress = client.getsockname()
+        server.handlePacket(struct.pack('!HHH', 0, 0, 8), clientAddress)
+        server.handlePacket(struct.pack('!HHH', 0, 0, 4), clientAddress)
+    outputFile = server.flows[clientAddress]['outputFile']
+    assert os.path.exists(outputFile)
+
+    server.evictFlows()
+    assert clientAddress in server.flows
+
+    #A stray SYN and ACK without data leave neither a flow nor an empty file behind
+    server.flowTimeout = 0
+    server.evictFlows()
+    server.socket.close()
+    assert server.flows == {}
+    assert not os.path.exists(outputFile)
+
+
+def test_pool_sequential_and_concurrent_transfers(tmp_path):
+    port = freePort()
+    server, logPath = startServer(tmp_path, port, "-n", "2")
+    try:
+        waitFor(logPath, "Started 2 workers")
+
+        #Stray packets must not stop the workers
+        for _ in range(6):
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.sendto(struct.pack('!HHH', 0, 0, 4), ("127.0.0.1", port))
+                s.sendto(b"x", ("127.0.0.1", port))
+
+        for _ in range(2):
+            finishClient(startClient(tmp_path, port))
+
+        #With 16 clients the chance that the kernel sends all of them to the same worker is 1 in 32768
+        clients = [startClient(tmp_path, port) for _ in range(16)]
+        for client in clients:
+            finishClient(client)
+
+        log = waitFor(logPath, "18 transfers are finished")
+    finally:
+        stopServer(server)
+
+    receivedFiles = sorted(tmp_path.glob("received_photo_*.jpg"))
+    assert len(receivedFiles) == 18
+    for path in receivedFiles:
+        checkReceived(path)
+
+    workerData = {}
+    for workerId, data in re.findall(r"Worker (\d+) has received (\d+) bytes", log):
+        workerData[workerId] = int(data)
+    assert sum(workerData.values()) == 18 * receivedSize()
+    assert f"18 transfers are finished with {18 * receivedSize()} bytes in total" in log
+    #The clients are spread over both workers
+    assert all(data > 0 for data in workerData.values())
+
+    #The workers are stopped together with the supervisor, so the port is free again
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", port))
+
+
+def test_pool_fails_when_port_is_taken(tmp_path):
+    port = freePort()
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", port))
+        server, logPath = startServer(tmp_path, port, "-n", "2")
+        server.wait(timeout=20)
+
+    log = waitFor(logPath, "could not bind")
+    assert server.returncode != 0
+    assert "Started" not in log
+
+
+def test_single_server_ignores_second_client_while_busy(tmp_path):
+    port = freePort()
+    server, logPath = startServer(tmp_path, port)
+    try:
+        waitFor(logPath, "Server started")
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as first, socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as second:
+            first.settimeout(2)
+            second.settimeout(1)
+            first.sendto(struct.pack('!HHH', 0, 0, 8), ("127.0.0.1", port))
+            first.recvfrom(1000)
+            first.sendto(struct.pack('!HHH', 0, 0, 4), ("127.0.0.1", port))
+
+            second.sendto(struct.pack('!HHH', 0, 0, 8), ("127.0.0.1", port))
+            with pytest.raises(socket.timeout):
+                second.recvfrom(1000)
+
+            #Once the first client is done, the second one is served
+            first.sendto(struct.pack('!HHH', 0, 0, 2), ("127.0.0.1", port))
+            first.recvfrom(1000)
+            second.sendto(struct.pack('!HHH', 0, 0, 8), ("127.0.0.1", port))
+            _, _, flags = struct.unpack('!HHH', second.recvfrom(1000)[0])
+            assert flags == 12
+    finally:
+        stopServer(server)
+
+    assert "busy with another client" in open(logPath).read()
+
+
+def test_single_server_handles_transfers_in_a_row(tmp_path):
+    port = freePort()
+    server, logPath = startServer(tmp_path, port, "-d", "5")
+    try:
+        waitFor(logPath, "Server started")
+        for _ in range(2):
+            finishClient(startClient(tmp_path, port))
+        log = waitFor(logPath, "The throughput is", count=2)
+    finally:
+        stopServer(server)
+
+    assert log.count("The throughput is") == 2
+    assert log.count("Discarding 5") == 2
+    checkReceived(tmp_path / "received_photo.jpg")